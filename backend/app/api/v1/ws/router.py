@@ -4,7 +4,6 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, WebSocket
-from starlette.websockets import WebSocketDisconnect
 
 from app.api.deps import get_connection_manager
 from app.realtime.connection_manager import ConnectionManager
@@ -28,12 +27,12 @@ async def rates_websocket(
     await manager.connect(websocket)
 
     try:
-        # Keep the connection open until the client disconnects.
-        while True:
-            # We do not expect messages from the client.
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        # Keep the connection open until the client disconnects. Incoming
+        # frames are not expected, so they are discarded without decoding.
+        message = await websocket.receive()
+        while message["type"] != "websocket.disconnect":
+            message = await websocket.receive()
     except Exception as exc:
         logger.exception("Unexpected error in WebSocket connection: %s", exc)
+    finally:
         manager.disconnect(websocket)
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import os
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./crypto.db")
 
+# Connection pool tuning
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
 
 class Base(DeclarativeBase):
     """Global SQLAlchemy Declarative  Base for ORM models."""
@@ -15,8 +21,31 @@ class Base(DeclarativeBase):
     pass
 
 
-# Async engine (no autocommit/autoflush)
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+def _pool_options(url: str) -> dict[str, Any]:
+    """
+    Return pool settings for the given database URL.
+
+    In-memory SQLite (``:memory:``, an empty path, or a URI-mode URL with
+    ``mode=memory``) is served by a single StaticPool connection, which does
+    not accept sizing options, so it keeps SQLAlchemy's defaults.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (
+        parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory"
+    ):
+        return {}
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+# Async engine (no autocommit/autoflush), keeping pooled connections open
+# between sessions instead of reconnecting for every save.
+engine = create_async_engine(DATABASE_URL, echo=False, future=True, **_pool_options(DATABASE_URL))
 
 # Session factory (1 per request via dependency)
 AsyncSessionFactory = async_sessionmaker(
@@ -29,7 +29,10 @@ async def lifespan(app):
     await rates_manager.load_initial_averages()
 
     # Attach callback so every tick trigger a Websocket broadcast
-    rates_manager.set_update_callback(connection_manager.broadcast_rate_update)
+    rates_manager.set_update_callback(
+        connection_manager.broadcast_raw_json,
+        has_subscribers=connection_manager.has_clients,
+    )
 
     # Start Finnhub client in the background
     finnhub_client = FinnhubClient(rates_service=rates_manager)
@@ -42,9 +45,12 @@ async def lifespan(app):
         finnhub_task.cancel()
         try:
             await finnhub_task
-        except Exception:
+        except (asyncio.CancelledError, Exception):
             pass
 
+        # Save any hourly averages still queued for persistence
+        await rates_manager.stop()
+
 
 app = FastAPI(
     title="Crypto Streaming Dashboard API", version="1.0.0", lifespan=lifespan
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 from typing import Set
 
 from fastapi import WebSocket
 
-from app.schemas.rates import RateUpdateMessage
-
 logger = logging.getLogger(__name__)
 
+# Upper bound for a single client send; slower clients are dropped so they
+# cannot hold back the rest of the broadcast.
+SEND_TIMEOUT_SECONDS: float = 1.0
+
+# Upper bound for closing a dropped client; closing is best effort.
+CLOSE_TIMEOUT_SECONDS: float = 1.0
+
+# "Try again later": tells the client to reconnect after being dropped.
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
 
 class ConnectionManager:
     """
@@ -18,37 +28,73 @@ class ConnectionManager:
 
     def __init__(self) -> None:
         self._connections: Set[WebSocket] = set()
+        # Immutable view of _connections used by broadcasts; rebuilt only
+        # when a client connects or disconnects.
+        self._snapshot: tuple[WebSocket, ...] = ()
 
     async def connect(self, websocket: WebSocket) -> None:
         """Accept a new WebSocket connection and track it."""
         await websocket.accept()
         self._connections.add(websocket)
+        self._snapshot = tuple(self._connections)
         logger.info("WebSocket client connected. Total: %d", len(self._connections))
 
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket connection from the active set."""
         if websocket in self._connections:
             self._connections.remove(websocket)
+            self._snapshot = tuple(self._connections)
             logger.info(
                 "WebSocket client disconnected. Total: %d", len(self._connections)
             )
 
+    def has_clients(self) -> bool:
+        """Return True if at least one client is connected."""
+        return bool(self._connections)
+
     async def broadcast_text(self, message: str) -> None:
-        """Broadcast a raw text message to all connected clients."""
-        dead: list[WebSocket] = []
-        for ws in list(self._connections):
-            try:
-                await ws.send_text(message)
-            except Exception:
-                # Connection is likely dead, mark for removal.
-                dead.append(ws)
-
-        for ws in dead:
+        """
+        Broadcast a raw text message to all connected clients.
+
+        Sends are fanned out concurrently so a slow client does not delay
+        the others; any client whose send fails or times out is removed and
+        closed, so its endpoint exits and the browser sees the close.
+        """
+        connections = self._snapshot
+        results = await asyncio.gather(
+            *(self._send(ws, message) for ws in connections),
+            return_exceptions=True,
+        )
+
+        # Connection is likely dead (or too slow), drop it.
+        dropped = [
+            ws
+            for ws, result in zip(connections, results, strict=True)
+            if isinstance(result, Exception)
+        ]
+        if not dropped:
+            return
+
+        for ws in dropped:
             self.disconnect(ws)
+        await asyncio.gather(*(self._close(ws) for ws in dropped))
+
+    @staticmethod
+    async def _send(websocket: WebSocket, message: str) -> None:
+        """Send a text frame to a single client, bounded by SEND_TIMEOUT_SECONDS."""
+        await asyncio.wait_for(websocket.send_text(message), SEND_TIMEOUT_SECONDS)
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        """Close a dropped client, ignoring errors (it may already be gone)."""
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(
+                websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER), CLOSE_TIMEOUT_SECONDS
+            )
 
-    async def broadcast_rate_update(self, update: RateUpdateMessage) -> None:
-        """Broadcast a rate update message to all connected clients."""
+    async def broadcast_raw_json(self, payload: str) -> None:
+        """Broadcast an already-serialized JSON message to all connected clients."""
         if not self._connections:
             return
 
-        await self.broadcast_text(update.model_dump_json())
+        await self.broadcast_text(payload)
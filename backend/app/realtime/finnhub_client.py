@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
+import sys
 
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Dict, Optional
 
+import orjson
 import websockets
-from websockets.exceptions import ConnectionClosed
+from websockets.exceptions import ConnectionClosed, ConnectionClosedOK
 from app.services.rates_manager_service import RatesManagerService, InternalTick
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,15 @@ PAIR_TO_FINNHUB_SYMBOL: Dict[str, str] = {
     "ETH/BTC": "BINANCE:ETHBTC",
 }
 
+# Yield to the event loop after this many trades from a single frame.
+TRADES_PER_YIELD = 32
+
+# Reverse lookup used on every incoming trade. Pairs are interned so the
+# service's state lookup compares them by identity.
+FINNHUB_SYMBOL_TO_PAIR: Dict[str, str] = {
+    symbol: sys.intern(pair) for pair, symbol in PAIR_TO_FINNHUB_SYMBOL.items()
+}
+
 
 @dataclass
 class FinnhubConfig:
@@ -88,10 +98,15 @@ class FinnhubClient:
 
             await self._subscribe_all(ws)
 
-            async for raw in ws:
-                if self._stop_event.is_set():
-                    break
-                await self._handle_message(raw)
+            try:
+                while not self._stop_event.is_set():
+                    # Receive text frames as raw bytes: orjson parses them
+                    # directly, so there is no need to decode to str first.
+                    raw = await ws.recv(decode=False)
+                    await self._handle_message(raw)
+            except ConnectionClosedOK:
+                # Normal closure, same as the end of `async for raw in ws`.
+                pass
 
         logger.info("Finnhub Websocket connection closed.")
 
@@ -101,16 +116,16 @@ class FinnhubClient:
         """
         for pair, symbol in PAIR_TO_FINNHUB_SYMBOL.items():
             payload = {"type": "subscribe", "symbol": symbol}
-            await ws.send(json.dumps(payload))
+            await ws.send(orjson.dumps(payload).decode())
             logger.info("Subscribed to %s (%s)", pair, symbol)
 
-    async def _handle_message(self, raw: str) -> None:
+    async def _handle_message(self, raw: bytes) -> None:
         """
         Handle a single raw JSON message from Finnhub.
         """
         try:
-            message = json.loads(raw)
-        except json.JSONDecodeError:
+            message = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             logger.warning("Received invalid JSON from Finnhub: %s", raw)
             return
 
@@ -120,8 +135,12 @@ class FinnhubClient:
             return
 
         data = message.get("data") or []
-        for trade in data:
+        for i, trade in enumerate(data, start=1):
             await self._handle_trade(trade)
+            if i % TRADES_PER_YIELD == 0:
+                # ingest_tick rarely suspends, so give other tasks
+                # (broadcasts, REST handlers) a chance to run.
+                await asyncio.sleep(0)
 
     async def _handle_trade(self, trade: dict) -> None:
         """Convert a Finnhub trade dict into an InternalTick and pass it to the server
@@ -158,10 +177,7 @@ class FinnhubClient:
         """
         Map a Finnhub symbol (e.g. 'BINANCE:ETHUSDT') back to our internal pair.
         """
-        for pair, finnhub_symbol in PAIR_TO_FINNHUB_SYMBOL.items():
-            if symbol == finnhub_symbol:
-                return pair
-        return None
+        return FINNHUB_SYMBOL_TO_PAIR.get(symbol)
 
     async def stop(self) -> None:
         """
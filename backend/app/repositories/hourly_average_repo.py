@@ -3,7 +3,9 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Iterable, List, Sequence
 
-from sqlalchemy import Select, desc, select
+from sqlalchemy import Select, desc, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.models.hourly_average import HourlyAverage
@@ -26,29 +28,77 @@ class SqlAlchemyHourlyAverageRepository(HourlyAverageRepository):
         """
         Insert or update a row for the given (pair, hour_start)
         This method is idempotent: Calling it multiple times will simply overwrite the stored average and count
+
+        On PostgreSQL and SQLite this is a single INSERT ... ON CONFLICT DO UPDATE
+        on the unique (pair, hour_start) index. Other dialects fall back to a
+        SELECT followed by INSERT/UPDATE.
         """
         async with self._session_factory() as session:
             async with session.begin():  # it handles commit
-                stmt: Select[tuple[HourlyAverage]] = select(HourlyAverage).where(
-                    (HourlyAverage.pair == pair)
-                    & (HourlyAverage.hour_start == hour_start)
-                )
-                result = await session.execute(stmt)
-                existing: HourlyAverage | None = result.scalar_one_or_none()
-
-                if existing is None:
-                    # Insert new row
-                    obj = HourlyAverage(
+                dialect_name = session.get_bind().dialect.name
+                if dialect_name == "postgresql":
+                    pg_stmt = postgresql_insert(HourlyAverage).values(
                         pair=pair,
                         hour_start=hour_start,
                         avg_price=avg_price,
                         count=count,
                     )
-                    session.add(obj)
+                    await session.execute(
+                        pg_stmt.on_conflict_do_update(
+                            index_elements=[HourlyAverage.pair, HourlyAverage.hour_start],
+                            set_={
+                                "avg_price": pg_stmt.excluded.avg_price,
+                                "count": pg_stmt.excluded.count,
+                            },
+                        )
+                    )
+                elif dialect_name == "sqlite":
+                    sqlite_stmt = sqlite_insert(HourlyAverage).values(
+                        pair=pair,
+                        hour_start=hour_start,
+                        avg_price=avg_price,
+                        count=count,
+                    )
+                    await session.execute(
+                        sqlite_stmt.on_conflict_do_update(
+                            index_elements=[HourlyAverage.pair, HourlyAverage.hour_start],
+                            set_={
+                                "avg_price": sqlite_stmt.excluded.avg_price,
+                                "count": sqlite_stmt.excluded.count,
+                            },
+                        )
+                    )
                 else:
-                    # Update existing row
-                    existing.avg_price = avg_price
-                    existing.count = count
+                    await self._select_then_upsert(session, pair, hour_start, avg_price, count)
+
+    async def _select_then_upsert(
+        self,
+        session: AsyncSession,
+        pair: str,
+        hour_start: datetime,
+        avg_price: float,
+        count: int,
+    ) -> None:
+        """Portable upsert for dialects without ON CONFLICT support."""
+        stmt: Select[tuple[HourlyAverage]] = select(HourlyAverage).where(
+            (HourlyAverage.pair == pair) & (HourlyAverage.hour_start == hour_start)
+        )
+        result = await session.execute(stmt)
+        existing: HourlyAverage | None = result.scalar_one_or_none()
+
+        if existing is None:
+            # Insert new row
+            obj = HourlyAverage(
+                pair=pair,
+                hour_start=hour_start,
+                avg_price=avg_price,
+                count=count,
+            )
+            session.add(obj)
+        else:
+            # Update existing row
+            existing.avg_price = avg_price
+            existing.count = count
 
     async def get_latest_for_pairs(
         self,
@@ -58,18 +108,25 @@ class SqlAlchemyHourlyAverageRepository(HourlyAverageRepository):
         if not pair_list:
             return []
 
+        # Newest hour_start per requested pair, answered from the (pair, hour_start)
+        # index once per pair, then joined back to fetch just those rows.
+        latest = (
+            select(
+                HourlyAverage.pair.label("pair"),
+                func.max(HourlyAverage.hour_start).label("hour_start"),
+            )
+            .where(HourlyAverage.pair.in_(pair_list))
+            .group_by(HourlyAverage.pair)
+            .subquery()
+        )
+
         async with self._session_factory() as session:
-            stmt: Select[tuple[HourlyAverage]] = select(HourlyAverage).where(
-                HourlyAverage.pair.in_(list(pairs))
+            stmt: Select[tuple[HourlyAverage]] = select(HourlyAverage).join(
+                latest,
+                (HourlyAverage.pair == latest.c.pair)
+                & (HourlyAverage.hour_start == latest.c.hour_start),
             )
             result = await session.execute(stmt)
             rows: Sequence[HourlyAverage] = result.scalars().all()
 
-        latest_by_pair: dict[str, HourlyAverage] = {}
-
-        for row in rows:
-            current = latest_by_pair.get(row.pair)
-            if current is None or row.hour_start > current.hour_start:
-                latest_by_pair[row.pair] = row
-
-        return list(latest_by_pair.values())
+        return list(rows)
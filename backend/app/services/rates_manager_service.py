@@ -1,17 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Awaitable, Callable, Dict, Iterable, List, Optional
 
+import orjson
+
 from app.repositories.protocol import HourlyAverageRepository
-from app.schemas.rates import RateUpdateMessage
 
 
+logger = logging.getLogger(__name__)
+
 SUPPORTED_PAIRS: tuple[str, ...] = ("ETH/USDC", "ETH/USDT", "ETH/BTC")
 
+# How long ticks are coalesced before one update per changed pair is emitted.
+DEFAULT_FLUSH_INTERVAL: float = 0.05
+
+# Closed hours waiting to be saved, and how hard the worker tries to save each.
+PERSIST_QUEUE_SIZE: int = 100
+PERSIST_MAX_ATTEMPTS: int = 3
+PERSIST_RETRY_DELAY: float = 0.5
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class InternalTick:
     """Domain-level representation of a price tick coming from Finnhub."""
 
@@ -20,7 +34,7 @@ class InternalTick:
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class PairRuntimeState:
     """In-memory aggregation state for a single trading pair."""
 
@@ -30,12 +44,16 @@ class PairRuntimeState:
 
     # Current hour aggregation:
     hour_start: Optional[datetime] = None
-    sum_prices: float = 0.0
+    # Hours since the epoch for hour_start, used to compare buckets cheaply
+    hour_epoch: Optional[int] = None
     count: int = 0
     hourly_avg: Optional[float] = None
 
+    # Cached public view, reset whenever the fields above change
+    public_cache: Optional[PairPublicState] = None
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PairPublicState:
     """Public-facing state used by higher layers (REST, WebSocket)."""
 
@@ -52,38 +70,75 @@ class RatesManagerService:
     - Maintaining in-memory state of the latest price per pair
     - Aggregating ticks into hourly averages
     - Persisting hourly averages via the repository when an hour is closed
+      (in a background worker, so ingestion never waits on the database)
     - Optionally notifying an external listener (e.g. WebSocket manager)
-      whenever a new tick is processed
+      about new ticks, coalesced to at most one update per pair per
+      flush interval
     """
 
     def __init__(
         self,
         hourly_avg_repo: HourlyAverageRepository,
         supported_pairs: Iterable[str] | None = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
     ) -> None:
         self._repo = hourly_avg_repo
-        self._pairs: tuple[str, ...] = tuple(supported_pairs or SUPPORTED_PAIRS)
+        self._flush_interval = flush_interval
+        # Interned so lookups with the same pair strings (e.g. from the
+        # Finnhub symbol mapping) hit the identity fast path of dict probes.
+        self._pairs: tuple[str, ...] = tuple(
+            sys.intern(pair) for pair in (supported_pairs or SUPPORTED_PAIRS)
+        )
 
         # In-memory state keyed by pair symbol
         self._state: Dict[str, PairRuntimeState] = {
             pair: PairRuntimeState(pair=pair) for pair in self._pairs
         }
 
-        # Optional callback for broadcasting updates
-        self._on_tick_update: Optional[
-            Callable[[RateUpdateMessage], Awaitable[None]]
-        ] = None
+        # Optional callback for broadcasting updates (receives pre-serialized JSON)
+        self._on_tick_update: Optional[Callable[[str], Awaitable[None]]] = None
+        # Optional check telling whether anyone is listening to updates
+        self._has_subscribers: Optional[Callable[[], bool]] = None
+
+        # Pairs updated since the last flush, and the pending flush (if any)
+        self._dirty: set[str] = set()
+        self._flush_task: Optional[asyncio.Task[None]] = None
+
+        # Closed hours waiting to be saved: (pair, hour_start, avg_price, count)
+        self._persist_queue: asyncio.Queue[tuple[str, datetime, float, int]] = (
+            asyncio.Queue(maxsize=PERSIST_QUEUE_SIZE)
+        )
+        self._persist_task: Optional[asyncio.Task[None]] = None
 
     def set_update_callback(
         self,
-        callback: Callable[[RateUpdateMessage], Awaitable[None]],
+        callback: Callable[[str], Awaitable[None]],
+        has_subscribers: Optional[Callable[[], bool]] = None,
     ) -> None:
         """
-        Register a callback to be executed whenever a new tick is ingested.
+        Register a callback to be executed when ingested ticks are flushed.
+
+        The callback receives the update already serialized as a JSON string
+        matching the RateUpdateMessage schema. If has_subscribers is given,
+        updates are only built while it returns True.
 
         Typical use case: send updates to a WebSocket ConnectionManager.
         """
         self._on_tick_update = callback
+        self._has_subscribers = has_subscribers
+
+    def reset(self) -> None:
+        """
+        Drop all in-memory pair state and pending (not yet flushed) updates.
+
+        Hourly averages already queued for persistence are kept.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._dirty.clear()
+
+        self._state = {pair: PairRuntimeState(pair=pair) for pair in self._pairs}
 
     async def load_initial_averages(self) -> None:
         """
@@ -100,9 +155,11 @@ class RatesManagerService:
                 # Unknown pair from the database, ignore defensively.
                 continue
 
-            state.hour_start = row.hour_start
+            state.hour_start = self._normalize_to_utc(row.hour_start)
+            state.hour_epoch = self._hour_epoch(state.hour_start)
             state.hourly_avg = row.avg_price
             state.count = row.count
+            state.public_cache = None
             # last_price / last_update will be filled as new ticks arrive
 
     async def ingest_tick(self, tick: InternalTick) -> None:
@@ -112,69 +169,226 @@ class RatesManagerService:
         - Update last price and last update timestamp
         - Update in-memory hourly aggregation
         - Persist the previous hour's average when we detect an hour change
-        - Emit a RateUpdateMessage via the callback if configured
+        - Schedule a rate update message via the callback if configured
+        """
+        self._apply_tick(tick)
+
+    async def ingest_ticks(self, ticks: Iterable[InternalTick]) -> None:
+        """
+        Process several ticks in order, e.g. all trades of one Finnhub frame.
+
+        Equivalent to calling ingest_tick for each tick, in a single call.
         """
-        if tick.pair not in self._state:
+        for tick in ticks:
+            self._apply_tick(tick)
+
+    def _apply_tick(self, tick: InternalTick) -> None:
+        """
+        Apply a single tick to the in-memory state.
+
+        Persistence and broadcasting are handed off to background tasks,
+        so this never needs to await.
+        """
+        state = self._state.get(tick.pair)
+        if state is None:
             # Ignore unsupported pairs defensively.
             return
 
-        state = self._state[tick.pair]
         normalized_ts = self._normalize_to_utc(tick.timestamp)
-        hour_start = self._truncate_to_hour(normalized_ts)
+        hour_epoch = self._hour_epoch(normalized_ts)
 
         # Update last known price and timestamp
         state.last_price = tick.price
         state.last_update = normalized_ts
+        state.public_cache = None
 
         # First tick ever for this pair
         if state.hour_start is None:
-            state.hour_start = hour_start
-            state.sum_prices = tick.price
+            state.hour_start = self._truncate_to_hour(normalized_ts)
+            state.hour_epoch = hour_epoch
             state.count = 1
             state.hourly_avg = tick.price
 
-            await self._emit_update(state)
+            self._mark_dirty(state)
             return
 
-        # Same hour: update running average
-        if hour_start == state.hour_start:
-            state.sum_prices += tick.price
+        # Same hour: update running average (no datetime needs to be built)
+        if hour_epoch == state.hour_epoch:
+            # Incremental mean, so no running sum has to be kept
+            previous_avg = (
+                state.hourly_avg if state.hourly_avg is not None else tick.price
+            )
             state.count += 1
-            state.hourly_avg = state.sum_prices / state.count
+            state.hourly_avg = previous_avg + (tick.price - previous_avg) / state.count
 
-            await self._emit_update(state)
+            self._mark_dirty(state)
             return
 
         # Hour changed: persist the previous hour and start a new bucket
-        await self._persist_current_hour(state)
+        self._persist_current_hour(state)
 
         # Initialize new hour bucket
-        state.hour_start = hour_start
-        state.sum_prices = tick.price
+        state.hour_start = self._truncate_to_hour(normalized_ts)
+        state.hour_epoch = hour_epoch
         state.count = 1
         state.hourly_avg = tick.price
 
-        await self._emit_update(state)
+        self._mark_dirty(state)
 
-    async def _persist_current_hour(self, state: PairRuntimeState) -> None:
+    async def backfill(self, ticks: Iterable[InternalTick]) -> int:
         """
-        Persist the current hour's aggregation for the given pair, if valid.
+        Aggregate historical ticks into hourly averages and save them.
+
+        Intended for replay/backfill, where many ticks are available at once:
+        ticks are grouped by (pair, hour) in a single pass and each bucket is
+        saved once, instead of going through ingest_tick per tick. Live
+        in-memory state and update listeners are not touched.
+
+        Returns the number of hourly buckets saved.
+        """
+        sums: Dict[tuple[str, int], float] = {}
+        counts: Dict[tuple[str, int], int] = {}
+
+        for tick in ticks:
+            if tick.pair not in self._state:
+                continue
+
+            key = (tick.pair, self._hour_epoch(self._normalize_to_utc(tick.timestamp)))
+            sums[key] = sums.get(key, 0.0) + tick.price
+            counts[key] = counts.get(key, 0) + 1
+
+        for (pair, hour_epoch), total in sums.items():
+            count = counts[(pair, hour_epoch)]
+            await self._repo.save(
+                pair=pair,
+                hour_start=datetime.fromtimestamp(hour_epoch * 3600, tz=timezone.utc),
+                avg_price=total / count,
+                count=count,
+            )
+
+        return len(sums)
+
+    def _persist_current_hour(self, state: PairRuntimeState) -> None:
+        """
+        Queue the current hour's aggregation for the given pair, if valid.
+
+        The actual save is done by a background worker, so the tick
+        pipeline does not wait on the database at hour boundaries.
         """
         if state.hour_start is None or state.hourly_avg is None or state.count <= 0:
             return
 
-        await self._repo.save(
-            pair=state.pair,
-            hour_start=state.hour_start,
-            avg_price=state.hourly_avg,
-            count=state.count,
-        )
+        if self._persist_task is None:
+            self._persist_task = asyncio.create_task(self._persist_worker())
+
+        try:
+            self._persist_queue.put_nowait(
+                (state.pair, state.hour_start, state.hourly_avg, state.count)
+            )
+        except asyncio.QueueFull:
+            logger.error(
+                "Persist queue full, dropping hourly average for %s at %s",
+                state.pair,
+                state.hour_start,
+            )
+
+    async def _persist_worker(self) -> None:
+        """Save queued hourly averages one at a time, retrying on failure."""
+        while True:
+            pair, hour_start, avg_price, count = await self._persist_queue.get()
+            try:
+                for attempt in range(1, PERSIST_MAX_ATTEMPTS + 1):
+                    try:
+                        await self._repo.save(
+                            pair=pair,
+                            hour_start=hour_start,
+                            avg_price=avg_price,
+                            count=count,
+                        )
+                        break
+                    except Exception:
+                        if attempt == PERSIST_MAX_ATTEMPTS:
+                            logger.exception(
+                                "Failed to persist hourly average for %s at %s",
+                                pair,
+                                hour_start,
+                            )
+                        else:
+                            await asyncio.sleep(PERSIST_RETRY_DELAY * attempt)
+            finally:
+                self._persist_queue.task_done()
+
+    async def stop(self) -> None:
+        """
+        Flush pending updates, wait for queued saves and stop background tasks.
+
+        Meant to be called on application shutdown.
+        """
+        await self.flush_updates()
+
+        if self._persist_task is not None:
+            await self._persist_queue.join()
+            self._persist_task.cancel()
+            try:
+                await self._persist_task
+            except asyncio.CancelledError:
+                pass
+            self._persist_task = None
+
+    def _mark_dirty(self, state: PairRuntimeState) -> None:
+        """
+        Record that the pair changed and make sure a flush is scheduled.
+
+        Bursts of ticks (e.g. one Finnhub frame with many trades) collapse
+        into a single update per pair instead of one broadcast per tick.
+        """
+        if self._on_tick_update is None:
+            return
+
+        if self._has_subscribers is not None and not self._has_subscribers():
+            # Nobody is listening: skip building and serializing the update.
+            return
+
+        self._dirty.add(state.pair)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Wait for the flush interval, then emit the pending updates."""
+        await asyncio.sleep(self._flush_interval)
+        # Clear before flushing so ticks arriving meanwhile schedule a new flush.
+        self._flush_task = None
+        try:
+            await self.flush_updates()
+        except Exception:
+            logger.exception("Failed to emit rate updates")
+
+    async def flush_updates(self) -> None:
+        """
+        Emit one update for every pair that changed since the last flush.
+
+        Can be called directly to flush immediately; any pending scheduled
+        flush is cancelled.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        if not self._dirty:
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        for pair in self._pairs:
+            if pair in dirty:
+                await self._emit_update(self._state[pair])
 
     async def _emit_update(self, state: PairRuntimeState) -> None:
         """
-        Build and emit a RateUpdateMessage using the configured callback,
-        if any. This keeps the broadcast logic decoupled from the core
-        aggregation logic.
+        Build and emit a rate update using the configured callback, if any.
+        This keeps the broadcast logic decoupled from the core aggregation logic.
+
+        The payload follows the RateUpdateMessage schema but is serialized
+        directly with orjson, skipping Pydantic validation on every tick.
         """
         if self._on_tick_update is None:
             return
@@ -188,14 +402,17 @@ class RatesManagerService:
             state.hourly_avg if state.hourly_avg is not None else state.last_price
         )
 
-        message = RateUpdateMessage(
-            pair=state.pair,
-            price=state.last_price,
-            hourly_avg=hourly_avg,
-            last_update=state.last_update,
-        )
+        payload = {
+            "type": "rate_update",
+            "pair": state.pair,
+            "price": state.last_price,
+            "hourly_avg": hourly_avg,
+            "last_update": state.last_update,
+        }
 
-        await self._on_tick_update(message)
+        await self._on_tick_update(
+            orjson.dumps(payload, option=orjson.OPT_UTC_Z).decode()
+        )
 
     def get_snapshot(self) -> List[PairPublicState]:
         """
@@ -203,19 +420,7 @@ class RatesManagerService:
 
         This is used by the REST layer to return an initial view of the system.
         """
-        snapshot: List[PairPublicState] = []
-
-        for pair, state in self._state.items():
-            snapshot.append(
-                PairPublicState(
-                    pair=pair,
-                    price=state.last_price,
-                    hourly_avg=state.hourly_avg,
-                    last_update=state.last_update,
-                )
-            )
-
-        return snapshot
+        return [self._public_state(state) for state in self._state.values()]
 
     def get_pair_state(self, pair: str) -> Optional[PairPublicState]:
         """
@@ -225,12 +430,22 @@ class RatesManagerService:
         if state is None:
             return None
 
-        return PairPublicState(
-            pair=pair,
-            price=state.last_price,
-            hourly_avg=state.hourly_avg,
-            last_update=state.last_update,
-        )
+        return self._public_state(state)
+
+    @staticmethod
+    def _public_state(state: PairRuntimeState) -> PairPublicState:
+        """
+        Return the public view of a pair, reusing the cached instance until
+        the next tick for that pair invalidates it.
+        """
+        if state.public_cache is None:
+            state.public_cache = PairPublicState(
+                pair=state.pair,
+                price=state.last_price,
+                hourly_avg=state.hourly_avg,
+                last_update=state.last_update,
+            )
+        return state.public_cache
 
     @staticmethod
     def _normalize_to_utc(ts: datetime) -> datetime:
@@ -244,6 +459,13 @@ class RatesManagerService:
             return ts.replace(tzinfo=timezone.utc)
         return ts.astimezone(timezone.utc)
 
+    @staticmethod
+    def _hour_epoch(ts: datetime) -> int:
+        """
+        Return the number of whole hours since the Unix epoch for a UTC datetime.
+        """
+        return int(ts.timestamp()) // 3600
+
     @staticmethod
     def _truncate_to_hour(ts: datetime) -> datetime:
         """
@@ -1,18 +1,38 @@
 import os
 import sys
+from typing import AsyncIterator
 
-import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 
 # This points to: /.../crypto-streaming-dashboard/backend
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+from app.api.deps import get_rates_manager  # noqa: E402
 from app.main import app  # noqa: E402  (import after sys.path setup)
+from app.services.rates_manager_service import RatesManagerService  # noqa: E402
+from tests.fakes import DUMMY_REPO  # noqa: E402
 
 
-@pytest.fixture(scope="session")
-def client() -> TestClient:
-    """Shared FastAPI TestClient for API tests."""
-    return TestClient(app)
+@pytest_asyncio.fixture(scope="module")
+async def aclient() -> AsyncIterator[AsyncClient]:
+    """
+    Shared async HTTP client for API tests.
+
+    Built once per module and bound to the app through ASGITransport, so
+    requests run on the test module's event loop. The rates service is
+    overridden with one backed by the dummy repository, so API tests
+    never touch the database. The app lifespan (table creation, Finnhub
+    client) is not started.
+    """
+    service = RatesManagerService(hourly_avg_repo=DUMMY_REPO)
+    app.dependency_overrides[get_rates_manager] = lambda: service
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_rates_manager, None)
@@ -0,0 +1,34 @@
+"""Test doubles shared by conftest.py and the test modules."""
+
+from datetime import datetime
+from typing import Iterable, List
+
+
+_EMPTY: List[object] = []
+
+
+class DummyHourlyAvgRepo:
+    """
+    Minimal fake repository used only for tests.
+
+    It implements the two methods that RatesManagerService expects:
+    - get_latest_for_pairs
+    - save
+
+    For these tests we do not care about persistence, only that calls succeed.
+    """
+
+    async def get_latest_for_pairs(self, pairs: Iterable[str]) -> List[object]:
+        # No initial averages for tests (shared constant, never mutated)
+        return _EMPTY
+
+    async def save(
+        self, pair: str, hour_start: datetime, avg_price: float, count: int
+    ) -> None:
+        # In these tests we do not assert on persistence,
+        # so this is intentionally a no-op.
+        return None
+
+
+# The dummy repository is stateless, so every service can share one instance
+DUMMY_REPO = DummyHourlyAvgRepo()
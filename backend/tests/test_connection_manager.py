@@ -0,0 +1,52 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.realtime import connection_manager as cm
+from app.realtime.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """
+    Minimal stand-in for a Starlette WebSocket.
+
+    Records sent messages and close codes; if `hang` is set, send_text never
+    completes, like a client that stopped reading.
+    """
+
+    def __init__(self, hang: bool = False) -> None:
+        self.hang = hang
+        self.sent: List[str] = []
+        self.close_codes: List[int] = []
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, message: str) -> None:
+        if self.hang:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_codes.append(code)
+
+
+@pytest.mark.asyncio
+async def test_hanging_client_is_removed_and_closed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # A client whose send times out is dropped and closed; others still get the message
+    monkeypatch.setattr(cm, "SEND_TIMEOUT_SECONDS", 0.01)
+    manager = ConnectionManager()
+    healthy = FakeWebSocket()
+    stuck = FakeWebSocket(hang=True)
+    await manager.connect(healthy)  # type: ignore[arg-type]
+    await manager.connect(stuck)  # type: ignore[arg-type]
+
+    await manager.broadcast_text("hello")
+
+    assert healthy.sent == ["hello"]
+    assert healthy.close_codes == []
+    assert stuck.close_codes == [cm.WS_CLOSE_TRY_AGAIN_LATER]
+    assert manager._snapshot == (healthy,)
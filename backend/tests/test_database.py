@@ -0,0 +1,29 @@
+import pytest
+
+from app.core.database import _pool_options
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "sqlite+aiosqlite://",
+        "sqlite+aiosqlite:///:memory:",
+        "sqlite+aiosqlite:///file:memdb?mode=memory&uri=true",
+    ],
+)
+def test_in_memory_sqlite_gets_no_pool_sizing(url: str) -> None:
+    # StaticPool rejects pool_size/max_overflow, so no options are passed
+    assert _pool_options(url) == {}
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "sqlite+aiosqlite:///./crypto.db",
+        "postgresql+asyncpg://user:secret@db/crypto",
+    ],
+)
+def test_pooled_databases_get_pool_sizing(url: str) -> None:
+    options = _pool_options(url)
+
+    assert {"pool_size", "max_overflow", "pool_pre_ping", "pool_recycle"} <= options.keys()
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.hourly_average import HourlyAverage
+from app.repositories.hourly_average_repo import SqlAlchemyHourlyAverageRepository
+
+UTC = timezone.utc
+
+T09_00 = datetime(2025, 1, 1, 9, 0, tzinfo=UTC)
+T10_00 = datetime(2025, 1, 1, 10, 0, tzinfo=UTC)
+T11_00 = datetime(2025, 1, 1, 11, 0, tzinfo=UTC)
+
+
+@pytest_asyncio.fixture
+async def session_factory(
+    tmp_path: Path,
+) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    # Fresh file-backed SQLite database per test
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_save_overwrites_existing_hour(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    # Saving the same (pair, hour_start) twice keeps one row with the latest values
+    repo = SqlAlchemyHourlyAverageRepository(session_factory=session_factory)
+
+    await repo.save(pair="ETH/USDC", hour_start=T10_00, avg_price=2000.0, count=1)
+    await repo.save(pair="ETH/USDC", hour_start=T10_00, avg_price=2050.0, count=2)
+
+    async with session_factory() as session:
+        rows = (await session.execute(select(HourlyAverage))).scalars().all()
+
+    assert len(rows) == 1
+    assert (rows[0].pair, rows[0].avg_price, rows[0].count) == ("ETH/USDC", 2050.0, 2)
+
+
+@pytest.mark.asyncio
+async def test_get_latest_for_pairs_returns_newest_row_per_pair(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    # Only the newest hour of each requested pair comes back; pairs without rows are skipped
+    repo = SqlAlchemyHourlyAverageRepository(session_factory=session_factory)
+
+    await repo.save(pair="ETH/USDC", hour_start=T09_00, avg_price=1900.0, count=3)
+    await repo.save(pair="ETH/USDC", hour_start=T11_00, avg_price=2100.0, count=5)
+    await repo.save(pair="ETH/USDC", hour_start=T10_00, avg_price=2000.0, count=4)
+    await repo.save(pair="ETH/BTC", hour_start=T09_00, avg_price=0.05, count=2)
+    # Not requested below, so it must not be returned
+    await repo.save(pair="ETH/EUR", hour_start=T11_00, avg_price=1800.0, count=1)
+
+    rows = await repo.get_latest_for_pairs(["ETH/USDC", "ETH/USDT", "ETH/BTC"])
+
+    latest = sorted((row.pair, row.avg_price, row.count) for row in rows)
+    assert latest == [("ETH/BTC", 0.05, 2), ("ETH/USDC", 2100.0, 5)]
+
+
+@pytest.mark.asyncio
+async def test_get_latest_for_pairs_without_rows_or_pairs_is_empty(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    repo = SqlAlchemyHourlyAverageRepository(session_factory=session_factory)
+
+    assert await repo.get_latest_for_pairs(["ETH/USDC"]) == []
+    assert await repo.get_latest_for_pairs([]) == []
+
+
+@pytest.mark.asyncio
+async def test_select_then_upsert_fallback_overwrites_existing_hour(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    # The portable path used for dialects without ON CONFLICT behaves like the upsert
+    repo = SqlAlchemyHourlyAverageRepository(session_factory=session_factory)
+
+    for avg_price, count in ((2000.0, 1), (2050.0, 2)):
+        async with session_factory() as session:
+            async with session.begin():
+                await repo._select_then_upsert(session, "ETH/USDC", T10_00, avg_price, count)
+
+    async with session_factory() as session:
+        rows = (await session.execute(select(HourlyAverage))).scalars().all()
+
+    assert len(rows) == 1
+    assert (rows[0].pair, rows[0].avg_price, rows[0].count) == ("ETH/USDC", 2050.0, 2)
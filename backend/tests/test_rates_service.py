@@ -1,122 +1,273 @@
-from datetime import datetime
-from typing import Iterable, List
+import asyncio
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable, List
 
 import pytest
 
+from app.models.hourly_average import HourlyAverage
+from app.schemas.rates import RateUpdateMessage
 from app.services.rates_manager_service import (
     InternalTick,
     RatesManagerService,
     PairPublicState,
 )
+from tests.fakes import DUMMY_REPO, DummyHourlyAvgRepo
 
 
-def ts(value: str) -> datetime:
-    # Helper to create a timezone-aware timestamp from an ISO string
-    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+UTC = timezone.utc
 
+# Timezone-aware timestamps used by the tests (2025-01-01, UTC)
+T10_00 = datetime(2025, 1, 1, 10, 0, tzinfo=UTC)
+T10_05 = datetime(2025, 1, 1, 10, 5, tzinfo=UTC)
+T10_15 = datetime(2025, 1, 1, 10, 15, tzinfo=UTC)
+T10_30 = datetime(2025, 1, 1, 10, 30, tzinfo=UTC)
+T10_59_59 = datetime(2025, 1, 1, 10, 59, 59, tzinfo=UTC)
+T11_00 = datetime(2025, 1, 1, 11, 0, tzinfo=UTC)
 
-class DummyHourlyAvgRepo:
-    """
-    Minimal fake repository used only for unit tests.
+# Shared, immutable ticks (InternalTick is a frozen dataclass)
+TICK_USDC_2000_T10_00 = InternalTick(pair="ETH/USDC", price=2000.0, timestamp=T10_00)
+TICK_USDC_2000_T10_05 = InternalTick(pair="ETH/USDC", price=2000.0, timestamp=T10_05)
+TICK_USDC_2100_T10_15 = InternalTick(pair="ETH/USDC", price=2100.0, timestamp=T10_15)
+TICK_USDC_2000_T10_59_59 = InternalTick(pair="ETH/USDC", price=2000.0, timestamp=T10_59_59)
+TICK_USDC_2200_T11_00 = InternalTick(pair="ETH/USDC", price=2200.0, timestamp=T11_00)
+TICK_USDT_3000_T10_00 = InternalTick(pair="ETH/USDT", price=3000.0, timestamp=T10_00)
+TICK_BTC_0_05_T10_30 = InternalTick(pair="ETH/BTC", price=0.05, timestamp=T10_30)
 
-    It implements the two methods that RatesManagerService expects:
-    - get_latest_for_pairs
-    - save
 
-    For these tests we do not care about persistence, only that calls succeed.
-    """
+class RecordingHourlyAvgRepo(DummyHourlyAvgRepo):
+    """Fake repository that keeps every saved hourly average in memory."""
 
-    async def get_latest_for_pairs(self, pairs: Iterable[str]) -> List[object]:
-        # No initial averages for tests
-        return []
+    def __init__(self) -> None:
+        self.saved: List[tuple[str, datetime, float, int]] = []
 
     async def save(
         self, pair: str, hour_start: datetime, avg_price: float, count: int
     ) -> None:
-        # In these tests we do not assert on persistence,
-        # so this is intentionally a no-op.
-        return None
+        self.saved.append((pair, hour_start, avg_price, count))
 
 
 def make_service() -> RatesManagerService:
-    # Helper to create a service with a dummy repository
-    repo = DummyHourlyAvgRepo()
-    return RatesManagerService(hourly_avg_repo=repo)
+    # Helper to create a service with the shared dummy repository
+    return RatesManagerService(hourly_avg_repo=DUMMY_REPO)
+
+
+def recording_callback() -> tuple[List[str], Callable[[str], Awaitable[None]]]:
+    # Helper returning an update callback and the list it records payloads into
+    received: List[str] = []
+
+    async def on_update(payload: str) -> None:
+        received.append(payload)
+
+    return received, on_update
+
+
+@pytest.fixture(scope="module")
+def shared_service() -> RatesManagerService:
+    # A single service reused by the tests in this module
+    return make_service()
+
+
+@pytest.fixture
+def svc(shared_service: RatesManagerService) -> RatesManagerService:
+    # Hand out the shared service with a clean in-memory state
+    shared_service.reset()
+    return shared_service
 
 
 @pytest.mark.asyncio
-async def test_ingest_tick_updates_price() -> None:
-    # A single tick should update the pair state with the latest price
-    svc = make_service()
+@pytest.mark.parametrize(
+    ("ticks", "expected"),
+    [
+        pytest.param(
+            # A single tick should update the pair state with the latest price
+            [TICK_USDC_2000_T10_00],
+            {"ETH/USDC": (2000.0, 2000.0)},
+            id="single-tick-updates-price",
+        ),
+        pytest.param(
+            # Multiple ticks in the same hour: the hourly average is the
+            # arithmetic mean of all prices in that bucket, (2000 + 2100) / 2
+            [TICK_USDC_2000_T10_05, TICK_USDC_2100_T10_15],
+            {"ETH/USDC": (2100.0, 2050.0)},
+            id="hourly-average-of-same-hour",
+        ),
+        pytest.param(
+            # Each pair should maintain its own independent state
+            [TICK_USDC_2000_T10_00, TICK_USDT_3000_T10_00],
+            {"ETH/USDC": (2000.0, 2000.0), "ETH/USDT": (3000.0, 3000.0)},
+            id="pairs-do-not-mix",
+        ),
+    ],
+)
+async def test_ingest_ticks_updates_pair_state(
+    svc: RatesManagerService,
+    ticks: List[InternalTick],
+    expected: dict[str, tuple[float, float]],
+) -> None:
+    await svc.ingest_ticks(ticks)
 
-    tick = InternalTick(
-        pair="ETH/USDC",
-        price=2000.0,
-        timestamp=ts("2025-01-01T10:00:00Z"),
-    )
+    for pair, (price, hourly_avg) in expected.items():
+        state: PairPublicState | None = svc.get_pair_state(pair)
+        assert state is not None
+        assert state.price == price
+        assert state.hourly_avg is not None
+        assert abs(state.hourly_avg - hourly_avg) < 1e-6
+        # We do not assert the exact timestamp value, just that it was set
+        assert state.last_update is not None
 
-    await svc.ingest_tick(tick)
 
-    state: PairPublicState | None = svc.get_pair_state("ETH/USDC")
-    assert state is not None
-    assert state.price == 2000.0
-    # We do not assert the exact timestamp value, just that it was set
-    assert state.last_update is not None
+@pytest.mark.asyncio
+async def test_update_callback_receives_rate_update_json() -> None:
+    # The callback should receive a JSON string matching RateUpdateMessage
+    svc = make_service()
+    received, on_update = recording_callback()
+    svc.set_update_callback(on_update)
+
+    await svc.ingest_tick(TICK_USDC_2000_T10_00)
+    await svc.flush_updates()
+
+    assert len(received) == 1
+    message = RateUpdateMessage.model_validate_json(received[0])
+    assert message.pair == "ETH/USDC"
+    assert message.price == 2000.0
+    assert message.hourly_avg == 2000.0
+    assert message.last_update == T10_00
 
 
 @pytest.mark.asyncio
-async def test_hourly_average_uses_multiple_ticks_in_same_hour() -> None:
-    # When multiple ticks arrive in the same hour, the hourly average
-    # should be the arithmetic mean of all prices in that bucket.
+async def test_burst_of_ticks_is_coalesced_into_one_update_per_pair() -> None:
+    # Several ticks for the same pair before a flush produce a single update
     svc = make_service()
+    received, on_update = recording_callback()
+    svc.set_update_callback(on_update)
 
-    await svc.ingest_tick(
-        InternalTick(
-            pair="ETH/USDC",
-            price=2000.0,
-            timestamp=ts("2025-01-01T10:05:00Z"),
-        )
-    )
-    await svc.ingest_tick(
-        InternalTick(
-            pair="ETH/USDC",
-            price=2100.0,
-            timestamp=ts("2025-01-01T10:15:00Z"),
+    for price in (2000.0, 2010.0, 2020.0):
+        await svc.ingest_tick(
+            InternalTick(
+                pair="ETH/USDC",
+                price=price,
+                timestamp=T10_00,
+            )
         )
+    await svc.flush_updates()
+
+    assert len(received) == 1
+    message = RateUpdateMessage.model_validate_json(received[0])
+    assert message.price == 2020.0
+
+
+@pytest.mark.asyncio
+async def test_scheduled_flush_emits_one_update_per_changed_pair() -> None:
+    # Without calling flush_updates(), the flush timer emits the burst by itself
+    svc = RatesManagerService(hourly_avg_repo=DUMMY_REPO, flush_interval=0.01)
+    received, on_update = recording_callback()
+    svc.set_update_callback(on_update)
+
+    await svc.ingest_ticks([TICK_USDC_2000_T10_00, TICK_USDT_3000_T10_00, TICK_USDC_2100_T10_15])
+    assert received == []
+    await asyncio.sleep(0.05)
+
+    messages = [RateUpdateMessage.model_validate_json(payload) for payload in received]
+    assert sorted((m.pair, m.price) for m in messages) == [
+        ("ETH/USDC", 2100.0),
+        ("ETH/USDT", 3000.0),
+    ]
+
+    # A tick after that flush schedules a new one
+    await svc.ingest_tick(TICK_BTC_0_05_T10_30)
+    await asyncio.sleep(0.05)
+
+    assert len(received) == 3
+    assert RateUpdateMessage.model_validate_json(received[2]).pair == "ETH/BTC"
+
+
+@pytest.mark.asyncio
+async def test_new_hour_starts_a_fresh_average() -> None:
+    # A tick in the next hour closes the previous bucket and restarts the average
+    repo = RecordingHourlyAvgRepo()
+    svc = RatesManagerService(hourly_avg_repo=repo)
+
+    await svc.ingest_tick(TICK_USDC_2000_T10_59_59)
+    await svc.ingest_tick(TICK_USDC_2200_T11_00)
+
+    state = svc.get_pair_state("ETH/USDC")
+    assert state is not None
+    assert state.hourly_avg == 2200.0
+
+    # The closed hour is saved in the background; stop() waits for it
+    await svc.stop()
+    assert repo.saved == [("ETH/USDC", T10_00, 2000.0, 1)]
+
+
+@pytest.mark.asyncio
+async def test_backfill_saves_one_average_per_pair_and_hour() -> None:
+    # Historical ticks are grouped by (pair, hour) and saved once per bucket
+    repo = RecordingHourlyAvgRepo()
+    svc = RatesManagerService(hourly_avg_repo=repo)
+
+    saved = await svc.backfill(
+        [
+            TICK_USDC_2000_T10_05,
+            TICK_USDC_2100_T10_15,
+            TICK_USDC_2200_T11_00,
+            TICK_BTC_0_05_T10_30,
+        ]
     )
 
+    assert saved == 3
+    assert sorted(repo.saved) == [
+        ("ETH/BTC", T10_00, 0.05, 1),
+        ("ETH/USDC", T10_00, 2050.0, 2),
+        ("ETH/USDC", T11_00, 2200.0, 1),
+    ]
+    # Live state is left untouched
     state = svc.get_pair_state("ETH/USDC")
     assert state is not None
-    # Expected average: (2000 + 2100) / 2 = 2050
-    assert state.hourly_avg is not None
-    assert abs(state.hourly_avg - 2050.0) < 1e-6
+    assert state.price is None
 
 
 @pytest.mark.asyncio
-async def test_ticks_for_different_pairs_do_not_mix() -> None:
-    # Each pair should maintain its own independent state
+async def test_no_update_is_built_without_subscribers() -> None:
+    # With no connected clients the callback should never be invoked
     svc = make_service()
+    received, on_update = recording_callback()
+    svc.set_update_callback(on_update, has_subscribers=lambda: False)
 
-    await svc.ingest_tick(
-        InternalTick(
-            pair="ETH/USDC",
-            price=2000.0,
-            timestamp=ts("2025-01-01T10:00:00Z"),
-        )
-    )
-    await svc.ingest_tick(
-        InternalTick(
-            pair="ETH/USDT",
-            price=3000.0,
-            timestamp=ts("2025-01-01T10:00:00Z"),
-        )
-    )
+    await svc.ingest_tick(TICK_USDC_2000_T10_00)
+    await svc.flush_updates()
+
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_pair_state_is_rebuilt_after_a_new_tick(svc: RatesManagerService) -> None:
+    # The cached public state must not outlive the tick that produced it
+    await svc.ingest_tick(TICK_USDC_2000_T10_00)
+    first = svc.get_pair_state("ETH/USDC")
+
+    await svc.ingest_tick(TICK_USDC_2100_T10_15)
+    second = svc.get_pair_state("ETH/USDC")
+
+    assert first is not None and second is not None
+    assert second is not first
+    assert (first.price, first.hourly_avg) == (2000.0, 2000.0)
+    assert (second.price, second.hourly_avg) == (2100.0, 2050.0)
+    assert second.last_update == T10_15
+
+
+@pytest.mark.asyncio
+async def test_load_initial_averages_refreshes_cached_pair_state() -> None:
+    # Loading stored averages replaces a public state that was already cached
+    class StoredAverageRepo(DummyHourlyAvgRepo):
+        async def get_latest_for_pairs(self, pairs: Iterable[str]) -> List[object]:
+            return [HourlyAverage(pair="ETH/USDC", hour_start=T10_00, avg_price=1950.0, count=4)]
 
-    usdc = svc.get_pair_state("ETH/USDC")
-    usdt = svc.get_pair_state("ETH/USDT")
+    svc = RatesManagerService(hourly_avg_repo=StoredAverageRepo())
+    before = svc.get_pair_state("ETH/USDC")
 
-    assert usdc is not None
-    assert usdt is not None
+    await svc.load_initial_averages()
+    after = svc.get_pair_state("ETH/USDC")
 
-    assert usdc.price == 2000.0
-    assert usdt.price == 3000.0
+    assert before is not None and after is not None
+    assert before.hourly_avg is None
+    assert after.hourly_avg == 1950.0